@@ -31,10 +31,20 @@ Author:   Tony Matthews
 # totals:      Plot graph showing total cases / total deaths
 ##################################################################################################
 
-import json
+import os
+import re
+import codecs
+import mmap
+try :
+    import orjson as json       # faster C parser for the large data file, if it is available
+except ImportError :
+    import json
 import datetime
+import functools
 import math
+import numpy as np
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 
 def int0(i):
     if i is None :
@@ -47,22 +57,43 @@ def average(lst):
     """
     return sum(lst) / len(lst) 
 
+def first_index(mask) :
+    """
+    return the index of the first True value in an array of booleans, or None if there isn't one
+    """
+    if len(mask) == 0 : return None
+    i = int(np.argmax(mask))
+    return i if mask[i] else None
+
+@functools.lru_cache(maxsize=512)
+def num_format(n, width, small=False) :
+    """
+    format a rounded number n for display, cached as the same values repeat in data tables
+    """
+    s = '< 0.5' if small else f"{n:,}"
+    return s if width == 0 else f"{s:>{width}}"[-width:]
+
 def num(x, width=8): 
     """
     format a number for display in a data table
     """
-    if x is None :
-        if width == 0 : return '---'
-        else : return width * ' '
+    if x is None or np.isnan(x) : return '---' if width == 0 else width * ' '
     n = int(round(x,0))
-    if n == 0 and x > 0 :
-        s = width * ' ' + '< 0.5'
-    else :
-        s = width * ' ' + f"{n:,}"
-    return s if width==0 else s[-width:]
+    return num_format(n, width, n == 0 and x > 0)
+
+def num_list(values, width=8) :
+    """
+    format an array of numbers for display in a data table, as for num() but rounding the whole array in one go
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.rint(values)
+    small = (rounded == 0) & (values > 0)
+    blank = '---' if width == 0 else width * ' '
+    return [blank if x != x else num_format(int(n), width, s) for x, n, s in zip(values.tolist(), rounded.tolist(), small.tolist())]
 
-json_data = None        # string with json data downloaded from web site
 region_name = {}        # dictionary of geoIds available in the data
+region_records = {}     # dictionary of (indicator, year_week, population, weekly_count) records for each geoId, parsed from the json data file
+region_data = {}        # dictionary of data arrays already built for each geoId from region_records
 
 # global settings
 ylog_setting = 1        # global default Y axis setting
@@ -110,33 +141,46 @@ def setting(days=None, predict=None, ylog=None, daily=None, infection=None, tota
     if debug is not None : debug_setting = debug
     return
 
+invalid_lines = re.compile(rb'^(?:\xef\xbb\xbf)?(?:\d|dateRep).*\n?', re.MULTILINE)     # csv header / data lines in the download file
+
+@functools.lru_cache(maxsize=4)
+def data_parse(fn, mtime) :
+    """
+    read and parse json data file fn, the result is cached until the file modification time changes
+    returns (lines read, region names, records for each region)
+    """
+    # scan the memory mapped file and remove invalid lines (after any BOM) in one pass, so the file is only copied once
+    # both json parsers accept utf-8 bytes so there is no need to decode the buffer
+    with open(fn, 'rb') as f :
+        if os.fstat(f.fileno()).st_size == 0 : data, removed = b'', 0
+        else :
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm :
+                data, removed = invalid_lines.subn(b'', mm)
+    if data[:3] == codecs.BOM_UTF8 : data = data[3:]
+    n = data.count(b'\n') + (1 if data and data[-1:] != b'\n' else 0) + removed
+    # build dictionary of the region names and group the records by region, so they are only parsed once.
+    # records only keep the fields used by region_load: (indicator, year_week, population, weekly_count)
+    names = {}
+    records = {}
+    for r in json.loads(data) :
+        id = r.get('country_code')
+        if id not in names :
+            names[id] = r.get('country').replace('_', ' ')
+            records[id] = []
+        records[id].append((r.get('indicator'), r.get('year_week'), r.get('population'), r.get('weekly_count')))
+    return (n, names, records)
+
 def data_load(fn, find=None, debug=None) :
     """
     load json data file fn and build dictionary of region names 
     """
     # clean up any problems in the download file and load buffer
-    global json_data, region_name, debug_setting
+    global region_name, region_records, region_data, debug_setting
     if debug is None : debug = debug_setting
-    n=0
-    s = ''
-    f = open(fn, 'r' )
-    while True :
-        line = f.readline()
-        if line == '' : break   # end of file
-        n += 1
-        # ignore BOM if there is one and remove invalid lines
-#        if n==1 : line ="{"
-        if line[0].isdigit() or line[0:7] == 'dateRep' : continue
-        s += line
-    f.close()
-    json_data = s
+    parsed = data_parse(fn, os.path.getmtime(fn))
+    if parsed[2] is not region_records : region_data = {}      # new data, so regions need to be built again
+    n, region_name, region_records = parsed
     if debug > 1 : print(f"{n:,} lines read from {fn}")
-    # build dictionary of the region names
-    region_name = {}
-    for r in json.loads(json_data) :
-        id = r.get('country_code')
-        if id not in region_name.keys() :
-            region_name[id] = r.get('country').replace('_', ' ')
     if debug > 0 : print(f"{len(region_name.keys())} region(s) found in {fn}")
     # find region?
     if find is not None and len(region_name) > 0 :
@@ -149,63 +193,56 @@ def data_load(fn, find=None, debug=None) :
         print(f"\n{n} region(s) containing '{find}' found in {fn}")
     return
 
+@functools.lru_cache(maxsize=None)
+def week_date(year_week) :
+    """
+    return the date of the thursday in a reporting week 'yyyy-ww'. the same weeks are used by every region
+    """
+    return datetime.datetime.strptime(year_week + '-4', "%Y-%W-%w")
+
 def region_load(fn=None, geoId=None, debug=None, population=None, density=None) :
     """
-    load json data for a region. fn and geoId are optional 
+    load json data for a region. fn and geoId are optional.
+    returns a dictionary of arrays for each field, indexed by day
     """
-    global json_data, region_name, debug_setting
+    global region_name, region_records, region_data, debug_setting
     if debug is None : debug = debug_setting
     if fn is not None : data_load(fn, debug=debug)
-    if geoId is None and len(region_name) > 0 : geoId = list(region_name.keys())[0]
-    if geoId is None or region_name.get(geoId) is None : return
-    # build a dictionary of records by date for the region with number of weekly cases and deaths
+    if geoId is None and len(region_name) > 0 : geoId = next(iter(region_name))
+    if region_name.get(geoId) is None : return
+    # return a copy of the dictionary if the arrays have already been built, so callers can add their own fields
+    if geoId in region_data : return dict(region_data[geoId])
+    # build a dictionary of [population, weekly cases, weekly deaths] by date for the region
     r_by_date = {}
-    for r in [r for r in json.loads(json_data) if r.get('country_code') == geoId] :
-        if r.get('indicator') == 'cases' :
-            dateRep = datetime.datetime.strptime(r.get('year_week') + '-4', "%Y-%W-%w")
-            record = {}
-            record['dateRep'] = dateRep
-            record['region'] = r.get('country_code')
-            record['population'] = int0(r.get('population'))
-            record['density'] = density
-            record['cases_weekly'] = int0(r.get('weekly_count'))
-            record['deaths_weekly'] = 0
-            r_by_date[dateRep] = record
-        elif r.get('indicator') == 'deaths' :
-            dateRep = datetime.datetime.strptime(r.get('year_week') + '-4', "%Y-%W-%w")
-            r_by_date[dateRep]['deaths_weekly'] = int(r.get('weekly_count'))
-    # convert dictionary to list
-    data = []
-    for r in r_by_date.values() : data.append(r)
-    # data is now reported weekly, expand into daily records
-    for i in range(0, len(data)) :
-        # track number of cases / deaths added in previous records
-        cases_added = 0
-        deaths_added = 0
-        for j in range(0,6):
-            r = {}
-            r['dateRep'] = data[i].get('dateRep') - datetime.timedelta(j+1)
-            r['cases'] = int0(data[i].get('cases_weekly') / 7)
-            r['deaths'] = int0(data[i].get('deaths_weekly') / 7)
-            r['population'] = data[i].get('population')
-            r['density'] = data[i].get('density')
-            data.append(r)
-            cases_added += r['cases']
-            deaths_added += r['deaths']
-        # ensure total is correct by subtracting what we added for 6 days from weekly total
-        data[i]['cases'] = data[i].get('cases_weekly') - cases_added
-        data[i]['deaths'] = data[i].get('deaths_weekly') - deaths_added
-    # sort records into ascending date order
-    data = sorted(data, key = lambda r: r.get('dateRep'))
+    for indicator, year_week, pop, weekly_count in region_records.get(geoId, []) :
+        if indicator == 'cases' :
+            r_by_date[week_date(year_week)] = [int0(pop), int0(weekly_count), 0]
+        elif indicator == 'deaths' :
+            r_by_date[week_date(year_week)][2] = int(weekly_count)
+    # sort the weeks into ascending date order. weeks do not overlap, so the daily records built from them are in order too
+    dates = np.array(list(r_by_date.keys()), dtype='datetime64[us]')
+    weekly = np.array(list(r_by_date.values()), dtype=np.int64).reshape(-1, 3)
+    order = np.argsort(dates, kind='stable')
+    dates, weekly = dates[order], weekly[order]
+    population, cases_weekly, deaths_weekly = weekly[:, 0], weekly[:, 1], weekly[:, 2]
+    # data is now reported weekly, expand into daily records for the 6 days before each weekly record
+    cases = np.repeat((cases_weekly / 7).astype(np.int64), 7).reshape(-1, 7)
+    deaths = np.repeat((deaths_weekly / 7).astype(np.int64), 7).reshape(-1, 7)
+    # ensure total is correct by subtracting what we added for 6 days from weekly total
+    cases[:, -1] = cases_weekly - 6 * cases[:, 0]
+    deaths[:, -1] = deaths_weekly - 6 * deaths[:, 0]
+    data = {}
+    data['dateRep'] = (dates[:, None] - np.arange(6, -1, -1).astype('timedelta64[D]')).ravel().astype(object)
+    # daily case and death counts are held as int32 to halve the size of the arrays.
+    # running totals and population stay int64, as they can get close to the int32 limit and cumsum would wrap silently
+    data['cases'] = cases.ravel().astype(np.int32)
+    data['deaths'] = deaths.ravel().astype(np.int32)
+    data['population'] = np.repeat(population, 7)
     # calculate cumulative data
-    cases_to_date = 0
-    deaths_to_date = 0
-    for r in data :
-        cases_to_date += r.get('cases')
-        deaths_to_date += r.get('deaths')
-        r['cases_to_date'] = cases_to_date
-        r['deaths_to_date'] = deaths_to_date
-    return(data)
+    data['cases_to_date'] = np.cumsum(data['cases'], dtype=np.int64)
+    data['deaths_to_date'] = np.cumsum(data['deaths'], dtype=np.int64)
+    region_data[geoId] = data
+    return(dict(data))
 
 class Region :
     """
@@ -230,23 +267,23 @@ class Region :
         # load data
         global region_name
         self.data = region_load(fn, geoId, self.debug, population, density)
-        if geoId is None and len(region_name) > 0 : geoId = list(region_name.keys())[0]
-        if geoId is None or region_name.get(geoId) is None :
+        if geoId is None and len(region_name) > 0 : geoId = next(iter(region_name))
+        self.name = region_name.get(geoId)
+        if self.name is None :
             print(f"Region not recognised: '{geoId}'\n")
             return
         self.geoId = geoId
-        self.name = region_name.get(geoId)
         if self.debug > 0 : print(f"Region {self.geoId} = {self.name}")
         # check we have some data to work on
-        if len(self.data) == 0 :
+        self.count = len(self.data['dateRep'])
+        if self.count == 0 :
             print(f"no records available for geoId {self.geoId}")
             return
-        self.count = len(self.data)
-        self.latest = self.data[-1].get('dateRep')                                          # date when last data was provided
-        self.total_cases = self.data[-1].get('cases_to_date')                               # total number of cases reported
-        self.total_deaths = self.data[-1].get('deaths_to_date')                             # total number of deaths reported
-        self.population = self.data[-1].get('population')                                   # region population
-        self.density = self.data[-1].get('density')                                         # region population density (people / km2)
+        self.latest = self.data['dateRep'][-1]                                              # date when last data was provided
+        self.total_cases = int(self.data['cases_to_date'][-1])                              # total number of cases reported
+        self.total_deaths = int(self.data['deaths_to_date'][-1])                            # total number of deaths reported
+        self.population = int(self.data['population'][-1])                                  # region population
+        self.density = density                                                              # region population density (people / km2)
         self.case_rate = int(round(self.total_cases * 1000000.0 / self.population, 0))      # cases per million population
         self.death_rate = int(round(self.total_deaths * 1000000.0 / self.population, 0))    # deaths per million population
         # scan through data to calculate attributes and smoothed data
@@ -259,39 +296,38 @@ class Region :
         self.s_total_deaths = 0        # total number of deaths in smoothed data
         self.s_latest_days = None       # index for last day in smoothed data
         self.s_latest = None            # latest date in smoothed data
-        for i in range(0, len(self.data)) :
-            # find start day
-            if self.start_days is None and self.data[i].get('cases_to_date') >= 50 :
-                self.start = self.data[i].get('dateRep')
-                self.start_days = i - self.count
-            # find day zero
-            if self.day0_days is None and self.data[i].get('deaths_to_date') >= 50 :
-                self.day0 = self.data[i].get('dateRep')
-                self.day0_days = i - self.count
-            # calculate smoothed data points
-            s_cases = 0
-            s_deaths = 0
-            valid = 1
-            self.data[i]['s_cases'] = None
-            self.data[i]['s_deaths'] = None
-            for j in range(0, self.smooth) :
-                k = i + j - int(self.smooth/2)
-                # start and end averages are biased towards first / last data point
-                if k < 0 : valid = 0
-                if k >= len(self.data) : valid = 0
-                if valid == 1 :
-                    s_cases += self.data[k].get('cases') / self.smooth
-                    s_deaths += self.data[k].get('deaths') / self.smooth
-            if valid == 1 :
-                self.s_latest_days = i - self.count
-                self.s_latest = self.data[i].get('dateRep')
-                self.data[i]['s_cases'] = s_cases
-                self.data[i]['s_deaths'] = s_deaths
-                self.s_total_cases += s_cases
-                self.s_total_deaths += s_deaths
+        # find start day
+        i = first_index(self.data['cases_to_date'] >= 50)
+        if i is not None :
+            self.start_days = i - self.count
+            self.start = self.data['dateRep'][i]
+        # find day zero
+        i = first_index(self.data['deaths_to_date'] >= 50)
+        if i is not None :
+            self.day0_days = i - self.count
+            self.day0 = self.data['dateRep'][i]
+        # calculate smoothed data points as a moving average, using the difference between cumulative totals.
+        # start and end points without a full set of raw data points either side are not smoothed
+        half = int(self.smooth/2)
+        valid = slice(half, max(self.count - half, half))
+        s_cases = np.full(self.count, np.nan)
+        s_deaths = np.full(self.count, np.nan)
+        s_cases_to_date = np.full(self.count, np.nan)
+        s_deaths_to_date = np.full(self.count, np.nan)
+        c = np.concatenate(([0], self.data['cases_to_date']))
+        d = np.concatenate(([0], self.data['deaths_to_date']))
+        s_cases[valid] = (c[self.smooth:] - c[:-self.smooth]) / self.smooth
+        s_deaths[valid] = (d[self.smooth:] - d[:-self.smooth]) / self.smooth
+        s_cases_to_date[valid] = np.cumsum(s_cases[valid])
+        s_deaths_to_date[valid] = np.cumsum(s_deaths[valid])
+        if valid.stop > valid.start :
+            self.s_latest_days = valid.stop - 1 - self.count
+            self.s_latest = self.data['dateRep'][self.s_latest_days]
+            self.s_total_cases = s_cases_to_date[self.s_latest_days]
+            self.s_total_deaths = s_deaths_to_date[self.s_latest_days]
         # rescale smoothed data to match actual totals and calculate parameters
-        case_rescale = self.data[self.s_latest_days].get('cases_to_date') / self.s_total_cases if self.s_total_cases > 0 else 1
-        death_rescale = self.data[self.s_latest_days].get('deaths_to_date') / self.s_total_deaths if self.s_total_deaths > 0 else 1
+        case_rescale = self.data['cases_to_date'][self.s_latest_days] / self.s_total_cases if self.s_total_cases > 0 else 1
+        death_rescale = self.data['deaths_to_date'][self.s_latest_days] / self.s_total_deaths if self.s_total_deaths > 0 else 1
         self.s_total_cases = 0          # total of smoothed cases
         self.s_total_deaths = 0         # total of smoothed deaths
         self.s_start_days = None        # index for start day in smoothed data
@@ -310,42 +346,50 @@ class Region :
         self.s_infection_latest = 0            # latest value for infection rate
         self.s_infection_latest_date = None    # date of latest infection rate
         self.s_infection_latest_days = None    # index for latest infection rate
+        # rescale smoothed data and cumulative totals, then calculate infection rate (compared to spread days earlier)
+        s_cases *= case_rescale
+        s_deaths *= death_rescale
+        s_cases_to_date *= case_rescale
+        s_deaths_to_date *= death_rescale
+        s_infection = np.full(self.count, np.nan)
+        previous = s_cases[:max(self.count - self.spread, 0)]
+        np.divide(s_cases[self.spread:], previous, out=s_infection[self.spread:], where=(previous != 0) & (s_cases_to_date[self.spread:] >= 500))
+        self.data['s_cases'] = s_cases
+        self.data['s_deaths'] = s_deaths
+        self.data['s_cases_to_date'] = s_cases_to_date
+        self.data['s_deaths_to_date'] = s_deaths_to_date
+        self.data['s_infection'] = s_infection
+        if self.s_latest_days is not None :
+            self.s_total_cases = s_cases_to_date[self.s_latest_days]
+            self.s_total_deaths = s_deaths_to_date[self.s_latest_days]
+        # find latest and peak infection rate
+        i = np.flatnonzero(~np.isnan(s_infection))
+        if len(i) > 0 :
+            self.s_infection_latest = s_infection[i[-1]]
+            self.s_infection_latest_days = int(i[-1]) - self.count
+            self.s_infection_latest_date = self.data['dateRep'][i[-1]]
+            i = int(np.nanargmax(s_infection))
+            if s_infection[i] > self.s_infection_peak :
+                self.s_infection_peak = s_infection[i]
+                self.s_infection_peak_days = i - self.count
+                self.s_infection_peak_date = self.data['dateRep'][i]
+        # find smoothed start day
+        i = first_index(s_cases_to_date >= 50)
+        if i is not None :
+            self.s_start_days = i - self.count
+            self.s_start = self.data['dateRep'][i]
+        # find smoothed day zero
+        i = first_index(s_deaths_to_date >= 50)
+        if i is not None :
+            self.s_day0_days = i - self.count
+            self.s_day0 = self.data['dateRep'][i]
+        # find smoothed peak cases day
         peak = 0
-        for i in range(0,len(self.data)) :
-            self.data[i]['s_cases_to_date'] = None
-            self.data[i]['s_deaths_to_date'] = None
-            self.data[i]['s_infection'] = None
-            if self.data[i].get('s_cases') is None : continue
-            # rescale smoothed data and update
-            self.data[i]['s_cases'] *= case_rescale
-            self.data[i]['s_deaths'] *= death_rescale
-            self.s_total_cases += self.data[i]['s_cases']
-            self.s_total_deaths += self.data[i]['s_deaths']
-            self.data[i]['s_cases_to_date'] = self.s_total_cases
-            self.data[i]['s_deaths_to_date'] = self.s_total_deaths
-            if i >= self.spread and self.s_total_cases >= 500 and self.data[i].get('s_cases') is not None and self.data[i - self.spread].get('s_cases') is not None and self.data[i - self.spread].get('s_cases') != 0:
-                # calculate infection rate
-                self.data[i]['s_infection'] = self.data[i].get('s_cases') / self.data[i - self.spread].get('s_cases')
-                self.s_infection_latest = self.data[i].get('s_infection')
-                self.s_infection_latest_days = i - self.count
-                self.s_infection_latest_date = self.data[i].get('dateRep')
-                if self.data[i].get('s_infection') > self.s_infection_peak :
-                    self.s_infection_peak = self.data[i].get('s_infection')
-                    self.s_infection_peak_days = i - self.count
-                    self.s_infection_peak_date = self.data[i].get('dateRep')
-            # find smoothed start day
-            if self.s_start_days is None and self.s_total_cases >= 50 :
-                self.s_start = self.data[i].get('dateRep')
-                self.s_start_days = i - self.count
-            # find smoothed day zero
-            if self.s_day0_days is None and self.s_total_deaths >= 50 :
-                self.s_day0 = self.data[i].get('dateRep')
-                self.s_day0_days = i - self.count
-            # find smoothed peak cases day
-            if self.data[i].get('s_cases') > peak :
-                peak = self.data[i].get('s_cases')
-                self.s_peak_cases = self.data[i].get('dateRep')
-                self.s_peak_case_days = i - self.count
+        if self.s_latest_days is not None and np.nanmax(s_cases) > peak :
+            i = int(np.nanargmax(s_cases))
+            peak = s_cases[i]
+            self.s_peak_case_days = i - self.count
+            self.s_peak_cases = self.data['dateRep'][i]
         # check if peak cases was found. Predict using growth days if not
         if self.s_peak_case_days is None :
             self.s_peak_case_days = self.s_start_days + self.growth_days
@@ -370,13 +414,15 @@ class Region :
         self.position = (self.s_latest_days - self.s_start_days) / (self.s_end_days - self.s_start_days)
         # find peak deaths, starting just before peak cases to avoid early false peaks
         peak = 0
-        for i in range(self.s_start_days - self.lag, self.s_latest_days + 1) :
-            if i > self.s_end_days : break      # avoid shifting to second peaks  i.e. china
-            if self.data[i].get('s_deaths') is None : continue
-            if self.data[i].get('s_deaths') > peak :
-                peak = self.data[i].get('s_deaths')
-                self.s_peak_deaths = self.data[i].get('dateRep')
-                self.s_peak_death_days = i
+        first = max(self.s_start_days - self.lag, -self.count)
+        last = min(self.s_latest_days, self.s_end_days)      # avoid shifting to second peaks  i.e. china
+        if first <= last :
+            window = np.nan_to_num(s_deaths[first:last + 1 if last < -1 else None], nan=0)
+            i = int(np.argmax(window))
+            if window[i] > peak :
+                peak = window[i]
+                self.s_peak_death_days = first + i
+                self.s_peak_deaths = self.data['dateRep'][self.s_peak_death_days]
         # check if peak deaths was found. Estimate day using lag if not
         if self.s_peak_death_days is None :
             # not found, use lag
@@ -410,20 +456,20 @@ class Region :
             print(f"  Now:         past end of first outbreak")
         # Add 1 to zero based indexes for relative day number
         print(f"  Start:       {self.s_start:%Y-%m-%d} ({self.s_start_days+1:3} days, when 50 or more cases were reported)")
-        print(f"  Peak Cases:  {self.s_peak_cases:%Y-%m-%d} ({self.s_peak_case_days+1:3} days, {num(self.data[self.s_peak_case_days].get('s_cases'),0)} cases)")
+        print(f"  Peak Cases:  {self.s_peak_cases:%Y-%m-%d} ({self.s_peak_case_days+1:3} days, {num(self.data['s_cases'][self.s_peak_case_days],0)} cases)")
         print(f"  End:         {self.s_end:%Y-%m-%d} ({self.s_end_days+1:3} days, {self.s_end_days - self.s_peak_case_days} days after peak cases)")
         if self.s_total_deaths >= 50 :
             print(f"  Day Zero:    {self.s_day0:%Y-%m-%d} ({self.s_day0_days+1:3} days, when 50 or more deaths were reported)")
             if self.s_peak_death_days < 0 :
-                print(f"  Peak Deaths: {self.s_peak_deaths:%Y-%m-%d} ({self.s_peak_death_days+1:3} days, {num(self.data[self.s_peak_death_days].get('s_deaths'),0)} deaths)")
+                print(f"  Peak Deaths: {self.s_peak_deaths:%Y-%m-%d} ({self.s_peak_death_days+1:3} days, {num(self.data['s_deaths'][self.s_peak_death_days],0)} deaths)")
             else :
                 print(f"  Peak Deaths: {self.s_peak_deaths:%Y-%m-%d} ({self.s_peak_death_days+1:3} days)")
         print()
         print(f"Parameters:")
-        print(f"  Totals:      {self.data[self.s_latest_days].get('cases_to_date'):,} cases and {self.data[self.s_latest_days].get('deaths_to_date'):,} deaths at end of {self.s_latest:%Y-%m-%d}")
+        print(f"  Totals:      {self.data['cases_to_date'][self.s_latest_days]:,} cases and {self.data['deaths_to_date'][self.s_latest_days]:,} deaths at end of {self.s_latest:%Y-%m-%d}")
         print(f"  Smoothed:    {int(self.s_total_cases):,} cases and {int(self.s_total_deaths):,} deaths at end of {self.s_latest:%Y-%m-%d} ({self.smooth} points)")
-        print(f"  Spread:      Peak infection rate {round(self.s_infection_peak,1)} ({self.s_infection_peak_date:%Y-%m-%d}, compared to {self.spread} days earlier)")
-        print(f"               Latest infection rate {round(self.s_infection_latest,1)} ({self.s_infection_latest_date:%Y-%m-%d}, compared to {self.spread} days earlier)")
+        print(f"  Spread:      Peak infection rate {self.s_infection_peak:.1f} ({self.s_infection_peak_date:%Y-%m-%d}, compared to {self.spread} days earlier)")
+        print(f"               Latest infection rate {self.s_infection_latest:.1f} ({self.s_infection_latest_date:%Y-%m-%d}, compared to {self.spread} days earlier)")
         print(f"  Growth:      {self.growth_days} days (Start -> Peak Cases) ")
         print(f"               X = {int(self.X_cases):,}, r = {round(self.r_cases,2)}, L = {int(self.L_cases):,}, dilation = {self.dilation_cases}, c = {self.C_cases:5.1%} for cases")
         if self.s_total_deaths >= 50 :
@@ -432,14 +478,14 @@ class Region :
         print()
         if self.s_end_days < 0 :
             d = self.s_end_days
-            total_cases = int(self.data[d].get('cases_to_date'))
+            total_cases = int(self.data['cases_to_date'][d])
             cases_rate = int(round(total_cases * 1000000 / self.population, 0))
-            total_deaths = int(self.data[d].get('deaths_to_date'))
+            total_deaths = int(self.data['deaths_to_date'][d])
             death_rate = int(round(total_deaths * 1000000 / self.population, 0))
-            print(f"Outcome: {total_cases:,} total cases, {total_deaths:,} total deaths at end of {self.data[d].get('dateRep'):%Y-%m-%d}")
+            print(f"Outcome: {total_cases:,} total cases, {total_deaths:,} total deaths at end of {self.data['dateRep'][d]:%Y-%m-%d}")
             print(f"  {cases_rate:,} cases per million ({cases_rate/1000000:5.2%}), {death_rate:,} deaths per million ({death_rate/1000000:5.3%})")
             if self.density is not None :
-                print(f"  {round(cases_rate / self.density, 1)} cases km2, {round(death_rate / self.density, 1)} deaths km2")
+                print(f"  {cases_rate / self.density:.1f} cases km2, {death_rate / self.density:.1f} deaths km2")
             print(f"  ** first wave ended **")
         else :
             total_cases = int(self.sigmoid_cases[-1])
@@ -451,7 +497,7 @@ class Region :
             print(f"  {total_cases / self.X_cases:5.1%} of predicted cases and {total_deaths / self.X_deaths:5.1%} of predicted deaths reported by end date")
             print(f"  {cases_rate:,} cases per million ({cases_rate/1000000:5.2%}), {death_rate:,} deaths per million ({death_rate/1000000:5.3%})")
             if self.density is not None :
-                print(f"  {round(cases_rate / self.density, 1)} cases km2, {round(death_rate / self.density, 1)} deaths km2")
+                print(f"  {cases_rate / self.density:.1f} cases km2, {death_rate / self.density:.1f} deaths km2")
         print()
         return
     
@@ -464,12 +510,12 @@ class Region :
         print()
         print(f"              Raw ----------       Total --------     Smoothed ------      Total ---------")
         print(f"Date          Cases   Deaths       Cases   Deaths     Cases   Deaths       Cases   Deaths")
-        for r in self.data[-1 * days:] :
-            print(f"{r.get('dateRep'):%Y-%m-%d} {num(r.get('cases'))} {num(r.get('deaths'))} " + \
-                  f" {num(r.get('cases_to_date'), 10)} {num(r.get('deaths_to_date'))} " + \
-                  f" {num(r.get('s_cases'))} {num(r.get('s_deaths'))} " + \
-                  f" {num(r.get('s_cases_to_date'), 10)} {num(r.get('s_deaths_to_date'))} ")
-        print()
+        # format the columns for the last number of days, then print the rows in one go, followed by a blank line
+        r = {k : self.data[k][-1 * days:] for k in ('dateRep', 'cases', 'deaths', 'cases_to_date', 'deaths_to_date', 's_cases', 's_deaths', 's_cases_to_date', 's_deaths_to_date')}
+        columns = zip([f"{d:%Y-%m-%d}" for d in r['dateRep']], num_list(r['cases']), num_list(r['deaths']), num_list(r['cases_to_date'], 10), num_list(r['deaths_to_date']),
+            num_list(r['s_cases']), num_list(r['s_deaths']), num_list(r['s_cases_to_date'], 10), num_list(r['s_deaths_to_date']))
+        rows = [f"{date} {cases} {deaths}  {cases_to_date} {deaths_to_date}  {s_cases} {s_deaths}  {s_cases_to_date} {s_deaths_to_date} " for date, cases, deaths, cases_to_date, deaths_to_date, s_cases, s_deaths, s_cases_to_date, s_deaths_to_date in columns]
+        print('\n'.join(rows + ['']))
         return
 
     def plot(self, ylog=None, daily=None, infection=None, totals=None, clip=None) :
@@ -483,8 +529,18 @@ class Region :
         if totals is None : totals = totals_setting
         if clip is None : clip = clip_setting
         days = self.s_start_days
-        dates = [r.get('dateRep') for r in self.data[days:]]
-        date_range = [self.s_start + datetime.timedelta(d) for d in range(0, max(len(self.data[days:]), len(self.bell_cases)),7)]
+        # convert dates to matplotlib date numbers once, rather than in each call to plot, axvline and xticks
+        dates = mdates.date2num(self.data['dateRep'][days:])
+        # dates for the bell distribution / sigmoid curves and infection rate, which all start from s_start
+        start = mdates.date2num(self.s_start)
+        model_dates = start + np.arange(0, len(self.bell_cases))
+        date_range = start + np.arange(0, max(len(dates), len(self.bell_cases)), 7)
+        date_format = mdates.DateFormatter('%Y-%m-%d')
+        # vertical markers drawn on each chart: (date, colour, label)
+        markers = [(start, 'grey', 'start')]
+        if self.s_total_deaths >= 50 :
+            markers += [(mdates.date2num(self.s_day0), 'tan', 'day0'), (mdates.date2num(self.s_peak_deaths), 'tan', 'peak')]
+        markers += [(mdates.date2num(self.s_peak_cases), 'grey', 'peak'), (mdates.date2num(self.s_end), 'grey', 'end'), (mdates.date2num(self.latest), 'green', 'now')]
         # plot daily data
         if daily > 0 :
             plt.figure(figsize=self.figsize)
@@ -494,21 +550,17 @@ class Region :
                 plt.title(f"{self.name} (log Y axis)\nNew Cases (green=raw, blue=smoothed)\nNew Deaths (orange=raw, red=smoothed)")
             else :
                 plt.title(f"{self.name}\nNew Cases (green=raw, blue=smoothed)\nNew Deaths (orange=raw, red=smoothed)")
-            plt.plot(dates, [r.get('s_cases') for r in self.data[days:]], color='blue', linestyle='solid')
-            plt.plot(dates, [r.get('s_deaths') for r in self.data[days:]], color='red', linestyle='solid')
-            plt.plot(dates, [r.get('cases') for r in self.data[days:]], color='green', linestyle='dotted')
-            plt.plot(dates, [r.get('deaths') for r in self.data[days:]], color='orange', linestyle='dotted')
-            plt.axvline(self.s_start, color='grey', linestyle='dashed', linewidth=2, label='start')
-            plt.plot([self.s_start + datetime.timedelta(d) for d in range(0, len(self.bell_cases))], self.bell_cases, color='grey', linestyle='dashed')
+            plt.plot(dates, self.data['s_cases'][days:], color='blue', linestyle='solid')
+            plt.plot(dates, self.data['s_deaths'][days:], color='red', linestyle='solid')
+            plt.plot(dates, self.data['cases'][days:], color='green', linestyle='dotted')
+            plt.plot(dates, self.data['deaths'][days:], color='orange', linestyle='dotted')
+            plt.plot(model_dates, self.bell_cases, color='grey', linestyle='dashed')
             if self.s_total_deaths >= 50 : 
-                plt.axvline(self.s_day0, color='tan', linestyle='dashed', linewidth=2, label='day0')
-                plt.plot([self.s_start + datetime.timedelta(d) for d in range(0, len(self.bell_deaths))], self.bell_deaths, color='grey', linestyle='dashed')
-                plt.axvline(self.s_peak_deaths, color='tan', linestyle='dashed', linewidth=2, label='peak')
-            plt.axvline(self.s_peak_cases, color='grey', linestyle='dashed', linewidth=2, label='peak')
-            plt.axvline(self.s_end, color='grey', linestyle='dashed', linewidth=2, label='end')
-            plt.axvline(self.latest, color='green', linestyle='dashed', linewidth=2, label='now')
+                plt.plot(model_dates, self.bell_deaths, color='grey', linestyle='dashed')
+            for x, color, label in markers : plt.axvline(x, color=color, linestyle='dashed', linewidth=2, label=label)
             plt.grid()
             plt.xticks(date_range, rotation=90)
+            plt.gca().xaxis.set_major_formatter(date_format)
             plt.show()
             print()
         # plot infection rate
@@ -522,20 +574,13 @@ class Region :
                 plt.title(f"{self.name}\nInfection Rate, based on number of new cases compared to {self.spread} days earlier\n(dotted line shows the predicted infection rate)")
                 if self.s_infection_peak > clip : plt.ylim([0, clip])
                 else : plt.ylim([0, 4 * (int(self.s_infection_peak / 4) + 1)])
-            plt.plot(dates, [r.get('s_infection') for r in self.data[days:]], color='brown', linestyle='solid')
-            plt.plot([self.s_start + datetime.timedelta(d) for d in range(0, len(self.infection))], self.infection, color='grey', linestyle='dashed')
+            plt.plot(dates, self.data['s_infection'][days:], color='brown', linestyle='solid')
+            plt.plot(model_dates, self.infection, color='grey', linestyle='dashed')
             plt.axhline(y=1, color='green', linestyle='dashed', linewidth=2, label='1')
-            plt.xticks([self.s_start + datetime.timedelta(d) for d in range(0, len(self.bell_cases),7)], rotation=90)
-            plt.axvline(self.latest, color='green', linestyle='dashed', linewidth=2, label='now')
-            plt.axvline(self.s_start, color='grey', linestyle='dashed', linewidth=2, label='start')
-            if self.s_total_deaths >= 50 : 
-                plt.axvline(self.s_day0, color='tan', linestyle='dashed', linewidth=2, label='day0')
-                plt.axvline(self.s_peak_deaths, color='tan', linestyle='dashed', linewidth=2, label='peak')
-            plt.axvline(self.s_peak_cases, color='grey', linestyle='dashed', linewidth=2, label='peak')
-            plt.axvline(self.s_end, color='grey', linestyle='dashed', linewidth=2, label='end')
-            plt.axvline(self.latest, color='green', linestyle='dashed', linewidth=2, label='now')
+            for x, color, label in markers : plt.axvline(x, color=color, linestyle='dashed', linewidth=2, label=label)
             plt.grid()
             plt.xticks(date_range, rotation=90)
+            plt.gca().xaxis.set_major_formatter(date_format)
             plt.show()
             print()
         # plot totals: 0 = no, 1 = yes, 2 = linear, 3 = log, 4 = deaths only
@@ -550,22 +595,17 @@ class Region :
             else :
                 plt.title(f"{self.name}\nTotal Cases (green=raw, blue=smoothed)\nTotal Deaths (orange=raw, red=smoothed)")
             if totals != 4 :
-                plt.plot(dates, [r.get('s_cases_to_date') for r in self.data[days:]], color='blue', linestyle='solid')
-                plt.plot(dates, [r.get('cases_to_date') for r in self.data[days:]], color='green', linestyle='dotted')
-                plt.plot([self.s_start + datetime.timedelta(d) for d in range(0, len(self.sigmoid_cases))], self.sigmoid_cases, color='grey', linestyle='dashed')
-            plt.axvline(self.s_peak_cases, color='grey', linestyle='dashed', linewidth=2, label='peak')
-            plt.plot(dates, [r.get('s_deaths_to_date') for r in self.data[days:]], color='red', linestyle='solid')
-            plt.plot(dates, [r.get('deaths_to_date') for r in self.data[days:]], color='orange', linestyle='dotted')
+                plt.plot(dates, self.data['s_cases_to_date'][days:], color='blue', linestyle='solid')
+                plt.plot(dates, self.data['cases_to_date'][days:], color='green', linestyle='dotted')
+                plt.plot(model_dates, self.sigmoid_cases, color='grey', linestyle='dashed')
+            plt.plot(dates, self.data['s_deaths_to_date'][days:], color='red', linestyle='solid')
+            plt.plot(dates, self.data['deaths_to_date'][days:], color='orange', linestyle='dotted')
             if self.s_total_deaths >= 50 : 
-                plt.axvline(self.s_day0, color='tan', linestyle='dashed', linewidth=2, label='day0')
-                plt.plot([self.s_start + datetime.timedelta(d) for d in range(0, len(self.sigmoid_deaths))], self.sigmoid_deaths, color='grey', linestyle='dashed')
-                plt.axvline(self.s_peak_deaths, color='tan', linestyle='dashed', linewidth=2, label='peak')
-            plt.axvline(self.latest, color='green', linestyle='dashed', linewidth=2, label='now')
-            plt.axvline(self.s_start, color='grey', linestyle='dashed', linewidth=2, label='start')
-            plt.axvline(self.s_end, color='grey', linestyle='dashed', linewidth=2, label='end')
-            plt.axvline(self.latest, color='green', linestyle='dashed', linewidth=2, label='now')
+                plt.plot(model_dates, self.sigmoid_deaths, color='grey', linestyle='dashed')
+            for x, color, label in markers : plt.axvline(x, color=color, linestyle='dashed', linewidth=2, label=label)
             plt.grid()
             plt.xticks(date_range, rotation=90)
+            plt.gca().xaxis.set_major_formatter(date_format)
             plt.show()
             print()
         return
@@ -575,6 +615,9 @@ class Region :
         return the scaled time from the day in the infection cycle, between t=-1 (s_start_days) to t=+1 (s_end_days)
         dilation controls the symmetry of the distribution by manipulating time when t > 0.
         """
+        i = day - self.s_start_days
+        table = self.t_table.get(offset)
+        if table is not None and 0 <= i < len(table) : return float(table[i])
         if offset == 1 :
             lag = self.lag
             dilation = self.dilation_deaths
@@ -585,39 +628,62 @@ class Region :
         if x > 0 and dilation != 1 : x /= dilation
         return x / self.cycle
 
+    def t_array(self, days, offset) :
+        """
+        return the scaled time for an array of days, as for t()
+        """
+        if offset == 1 :
+            lag = self.lag
+            dilation = self.dilation_deaths
+        else :
+            lag = 0
+            dilation = self.dilation_cases
+        x = (2 * (days - self.s_start_days - lag) - self.cycle).astype(float)
+        if dilation != 1 : x = np.where(x > 0, x / dilation, x)
+        return x / self.cycle
+
+    def fit_data(self, offset) :
+        """
+        return the scaled times and smoothed values used to measure the fit of the bell distribution.
+        the arrays are built once per offset and cleared by build_curves
+        """
+        if offset not in self.fit_arrays :
+            name = 's_cases' if offset == 0 else 's_deaths'
+            d2 = self.s_end_days if self.s_end_days < self.s_latest_days else self.s_latest_days
+            days = np.arange(self.s_start_days, d2 + 1)
+            y = self.data[name][days] if len(days) > 0 else np.array([])
+            keep = ~np.isnan(y)
+            self.fit_arrays[offset] = (self.t_table[offset][:len(days)][keep], y[keep])
+        return self.fit_arrays[offset]
+
     def bell_A(self, L, r, d, offset) :
         """
         return a point in the scaled bell distribution using the derritative of the sigmoid function 
         """
         x = self.t(d, offset)
-        A = L * math.exp(-1 * r * x) / (1 + math.exp(-1 * r * x)) ** 2
-        return A
+        e = math.exp(-r * x)
+        return L * e / (1 + e) ** 2
 
     def bell_L(self, A, r, d, offset) :
         """
         given a point in the bell distribution, work out the scale factor L
         """
         x = self.t(d, offset)
-        L = A * (1 + math.exp(-1 * r * x)) ** 2 / math.exp(-1 * r * x)
-        return L
+        e = math.exp(-r * x)
+        return A * (1 + e) ** 2 / e
 
     def abs_error(self, L, r, offset) :
         """
         calculate the absolute error between the smoothed data and bell distribution for a given L and r:
         """
-        name = 's_cases' if offset == 0 else 's_deaths'
-        n = 0
-        result = 0
-        d = self.s_start_days
-        if self.s_end_days < self.s_latest_days : d2 = self.s_end_days
-        else : d2 = self.s_latest_days
-        while d <= d2 : 
-            if self.data[d].get(name) is not None :
-                result += abs(self.data[d].get(name) - self.bell_A(L, r, d, offset))
-                n += 1
-            d += 1
-        if n == 0 : return None
-        else : return result
+        key = (L, r, offset)
+        if key not in self.fit_errors :
+            x, y = self.fit_data(offset)
+            if len(y) == 0 : self.fit_errors[key] = None
+            else :
+                e = np.exp(-r * x)
+                self.fit_errors[key] = float(np.abs(y - L * e / (1 + e) ** 2).sum())
+        return self.fit_errors[key]
 
     def bell_r(self, L, r, offset, tries=0) :
         """
@@ -626,16 +692,22 @@ class Region :
         cases = 'Cases' if offset == 0 else 'Deaths'
         n = 16
         step = 2.0
+        centre = None       # error at r, carried over from the previous step when r moves to a point already tested
+        abs_error = self.abs_error
+        debug = self.debug
         while step > 0.01 and n > 0 :
             # get errors ordered by r is lower, same, higher
-            error = [self.abs_error(L, r - step, offset), self.abs_error(L, r, offset), self.abs_error(L, r + step, offset)]
-            if self.debug > 1 : print(f"r={r}, step={step}, error = {error}")
+            if centre is None : centre = abs_error(L, r, offset)
+            error = [abs_error(L, r - step, offset), centre, abs_error(L, r + step, offset)]
+            if debug > 1 : print(f"r={r}, step={step}, error = {error}")
             direction = error.index(min(error)) - 1     # direction of lowest error is -1, 0, +1 steps
-            r += direction * step
+            new_r = r + direction * step
             if direction == 0 : step /= 2
             # limit stops to prevent run-away
-            if r < 4.0 : r = 4.0
-            if r > 8.0 : r = 8.0
+            if new_r < 4.0 : new_r = 4.0
+            if new_r > 8.0 : new_r = 8.0
+            centre = error[direction + 1] if new_r == r + direction * step else None
+            r = new_r
             n -= 1
         if self.debug > 0 : print(f"> {cases} {tries}: L = {int(L):,}, r = {round(r, 2)}")
         return r
@@ -645,39 +717,38 @@ class Region :
         given a point in the sigmoid distribution, work out the scale factor L
         """
         x = self.t(d, offset)
-        L = A * (1 + math.exp(-1 * r * x))
-        return L
+        return A * (1 + math.exp(-r * x))
 
-    def fit_cases(self, day) :
-        # fit L_cases and r_cases to the smoothed data
+    def fit_bell(self, day, r, offset) :
+        """
+        fit L and r for the bell distribution to the smoothed data, starting from r and anchored on day
+        returns (L, r)
+        """
+        name = 's_cases' if offset == 0 else 's_deaths'
         previous_L = 0.0
         previous_r = 0.0
         tries = 0
-        if self.r_cases is None : self.r_cases = 6
+        if r is None : r = 6
+        A = self.data[name][day]
         while tries < 10 :
-            self.L_cases = self.bell_L(self.data[day].get('s_cases'), self.r_cases, day, 0)
-            self.r_cases = self.bell_r(self.L_cases, self.r_cases, 0, tries)
-            if int(self.L_cases) == previous_L and round(self.r_cases, 2) == previous_r : break
-            previous_L = int(self.L_cases)
-            previous_r = round(self.r_cases,2)
+            L = self.bell_L(A, r, day, offset)
+            r = self.bell_r(L, r, offset, tries)
+            # stop when L and r are no longer changing, using a relative tolerance for L as it can be very large
+            if abs(L - previous_L) <= 1e-3 * abs(L) and abs(r - previous_r) < 1e-3 : break
+            previous_L = L
+            previous_r = r
             tries += 1
-        if tries >= 20 : print(f"** fit_cases was not solved")
+        if tries >= 20 : print(f"** fit for {name} was not solved")
+        return (L, r)
+
+    def fit_cases(self, day) :
+        # fit L_cases and r_cases to the smoothed data
+        self.L_cases, self.r_cases = self.fit_bell(day, self.r_cases, 0)
         return
         
     def fit_deaths(self, day) :
         # fit L_deaths and r_deaths to smoothed data
-        previous_L = 0.0
-        previous_r = 0.0
-        tries = 0
-        if self.r_deaths is None : self.r_deaths = 6
-        while tries < 10 :
-            self.L_deaths = self.bell_L(self.data[day].get('s_deaths'), self.r_deaths, day, 1)
-            self.r_deaths = self.bell_r(self.L_deaths, self.r_deaths, 1, tries)
-            if int(self.L_deaths) == previous_L and round(self.r_deaths, 2) == previous_r : break
-            previous_L = int(self.L_deaths)
-            previous_r = round(self.r_deaths, 2)
-            tries += 1
-        if tries >= 20 : print(f"** fit_deaths was not solved")
+        self.L_deaths, self.r_deaths = self.fit_bell(day, self.r_deaths, 1)
         return
 
     def build_curves(self) :
@@ -696,39 +767,40 @@ class Region :
         self.r_deaths = None            # r factor for deaths
         self.L_deaths = None            # scale factor for deaths bell distribution function
         self.X_deaths = None            # scale factor for deaths sigmoid function
+        self.fit_arrays = {}            # scaled times and smoothed values used by abs_error, by offset
+        self.fit_errors = {}            # errors already calculated by abs_error, by (L, r, offset)
+        # scaled times for each day from s_start_days to the later of s_end_days and s_latest_days, by offset
+        days = np.arange(self.s_start_days, max(self.s_end_days, self.s_latest_days) + 1)
+        self.t_table = {0 : self.t_array(days, 0), 1 : self.t_array(days, 1)}
         if self.s_peak_case_days < self.s_latest_days : d = self.s_peak_case_days
         else : d = self.s_latest_days
         self.fit_cases(d)
         if self.s_peak_death_days < self.s_latest_days : d = self.s_peak_death_days
         else : d = self.s_latest_days
         self.fit_deaths(d)
-        # generate data points, starting with point -1 so we can get a delta for new cases / deaths
-        cases = []
-        cases_to_date = 0
-        deaths = []
-        deaths_to_date = 0
-        for d in range(self.s_start_days, max(self.s_end_days, self.s_latest_days)) :
-            cases.append(self.bell_A(self.L_cases, self.r_cases, d, 0))
-            deaths.append(self.bell_A(self.L_deaths, self.r_deaths, d, 1))
-            if d <= self.s_latest_days :
-                cases_to_date += cases[-1]
-                deaths_to_date += deaths[-1]
+        # generate data points from the scaled times, with totals up to the latest day. row 0 is cases and row 1 is deaths
+        n = max(self.s_end_days, self.s_latest_days) - self.s_start_days
+        t = np.vstack((self.t_table[0][:n], self.t_table[1][:n]))
+        e = np.exp(-np.array([[self.r_cases], [self.r_deaths]]) * t)
+        bell = np.array([[self.L_cases], [self.L_deaths]]) * e / (1 + e) ** 2
+        latest = max(self.s_latest_days - self.s_start_days + 1, 0)
+        # sigmoid functions are the running totals of the bell distributions, so the totals to date can be read from them
+        sigmoid = np.cumsum(bell, axis=1)
+        cases_to_date, deaths_to_date = sigmoid[:, min(latest, n) - 1] if min(latest, n) > 0 else (0, 0)
         # work out rescale factors
         d = self.s_end_days if self.s_end_days < self.s_latest_days else self.s_latest_days
-        cases_rescale = self.data[d].get('s_cases_to_date') / cases_to_date if cases_to_date > 0 else 1
+        cases_rescale = self.data['s_cases_to_date'][d] / cases_to_date if cases_to_date > 0 else 1
         if self.debug > 0 : print(f"cases_rescale = {cases_rescale}")
-        deaths_rescale = self.data[d].get('s_deaths_to_date') / deaths_to_date if deaths_to_date > 0 else 1
+        deaths_rescale = self.data['s_deaths_to_date'][d] / deaths_to_date if deaths_to_date > 0 else 1
         if self.debug > 0 : print(f"deaths_rescale = {deaths_rescale}")
-        # apply scale factors to bell distributions and calculate sigmoid functions
-        cases_to_date = 0
-        deaths_to_date = 0
-        for i in range(0, len(cases)) :
-            self.bell_cases.append(cases[i] * cases_rescale)
-            self.bell_deaths.append(deaths[i] * deaths_rescale)
-            cases_to_date += self.bell_cases[-1]
-            deaths_to_date += self.bell_deaths[-1]
-            self.sigmoid_cases.append(cases_to_date)
-            self.sigmoid_deaths.append(deaths_to_date)
+        # apply scale factors to bell distributions and sigmoid functions, keeping each pair in one block.
+        # scaling distributes over the running total, so the sigmoid functions do not need to be summed again
+        rescale = np.array([[cases_rescale], [deaths_rescale]])
+        bell *= rescale
+        sigmoid *= rescale
+        self.bell_cases, self.bell_deaths = bell
+        self.sigmoid_cases, self.sigmoid_deaths = sigmoid
+        cases_to_date, deaths_to_date = sigmoid[:, -1] if n > 0 else (0, 0)
         # work out implied scale factors for sigmoid functions
         self.X_cases = self.sigmoid_L(cases_to_date, self.r_cases, self.s_end_days, 0)
         self.X_deaths = self.sigmoid_L(deaths_to_date, self.r_deaths, self.s_end_days, 1)
@@ -736,12 +808,9 @@ class Region :
         self.C_cases = 1.0 - self.abs_error(self.L_cases, self.r_cases, 0) / self.s_total_cases if self.s_total_cases != 0 else None
         self.C_deaths = 1.0 - self.abs_error(self.L_deaths, self.r_deaths, 1) / self.s_total_deaths if self.s_total_deaths !=0 else None
         # work out infection rate curve for cases:
-        self.infection = []
-        for i in range(0, len(self.sigmoid_cases)) :
-            if i >= self.spread and self.bell_cases[i - self.spread] != 0 :
-                self.infection.append(self.bell_cases[i] / self.bell_cases[i - self.spread])
-            else :
-                self.infection.append(None)
+        self.infection = np.full(len(self.bell_cases), np.nan)
+        previous = self.bell_cases[:max(len(self.bell_cases) - self.spread, 0)]
+        np.divide(self.bell_cases[self.spread:], previous, out=self.infection[self.spread:], where=previous != 0)
         return
 
     def prediction(self, predict=None, start=0) :
@@ -757,15 +826,15 @@ class Region :
         if predict < 1 : return
         print(f"              Prediction ---      Total -------")
         print(f"Date          Cases   Deaths      Cases  Deaths")
-        for d in range(0, predict) :
-            i = self.s_latest_days - self.s_start_days + d + start
-            date = self.s_latest + datetime.timedelta(d)
-            marker = f"  <-- latest raw data" if date == self.latest else ""
-            if i >= len(self.bell_cases) : break
-            print(f"{date:%Y-%m-%d}" + \
-                  f" {num(self.bell_cases[i])} {num(self.bell_deaths[i])}" + \
-                  f" {num(self.sigmoid_cases[i], 10)} {num(self.sigmoid_deaths[i])}{marker}")
-        print()
+        # build the rows and print the table in one go, followed by a blank line
+        i = self.s_latest_days - self.s_start_days + start
+        n = max(min(predict, len(self.bell_cases) - i), 0)
+        dates = np.datetime_as_string(np.datetime64(self.s_latest, 'D') + np.arange(0, n), unit='D')
+        latest = (self.latest - self.s_latest).days
+        days = i + np.arange(0, n)
+        columns = zip(dates, num_list(self.bell_cases[days]), num_list(self.bell_deaths[days]), num_list(self.sigmoid_cases[days], 10), num_list(self.sigmoid_deaths[days]))
+        rows = [f"{date} {cases} {deaths} {cases_total} {deaths_total}" + ("  <-- latest raw data" if d == latest else "") for d, (date, cases, deaths, cases_total, deaths_total) in enumerate(columns)]
+        print('\n'.join(rows + ['']))
         return
 
     def analyse(self, days=None, predict=None, ylog=None, daily=None, infection=None, totals=None) :